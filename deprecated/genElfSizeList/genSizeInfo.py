@@ -2,73 +2,223 @@ import os
 import csv
 import re
 import sys
+import shutil
 import subprocess
-from collections import defaultdict
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-def get_elf_section_sizes(filepath):
-    """Return (.text, .data, .bss) sizes for ELF files, or (0,0,0) otherwise."""
+try:
+    from elftools.elf.elffile import ELFFile  # pip install pyelftools
+    from elftools.elf.constants import SH_FLAGS
+except ImportError:
+    ELFFile = None
+
+SIZE_CMD = shutil.which('size')
+SIZE_BATCH = 256
+PARALLEL_MIN = 64
+POOL_CHUNKSIZE = 64
+ELF_MAGIC = b'\x7fELF'
+AR_MAGICS = (b'!<arch>\n', b'!<thin>\n')
+
+def is_size_candidate(filepath):
+    """Return True for files worth passing to `size`: ELF objects and (thin) ar archives."""
+    try:
+        with open(filepath, 'rb') as f:
+            head = f.read(len(AR_MAGICS[0]))
+    except OSError:
+        return False
+    return head.startswith(ELF_MAGIC) or head in AR_MAGICS
+
+def read_elf_section_sizes(f):
+    """Return (.text, .data, .bss) of an open ELF file, summed like `size` (Berkeley format)."""
+    text = data = bss = 0
+    for sec in ELFFile(f).iter_sections():
+        flags = sec['sh_flags']
+        if not flags & SH_FLAGS.SHF_ALLOC:
+            continue
+        if flags & SH_FLAGS.SHF_EXECINSTR or not flags & SH_FLAGS.SHF_WRITE:
+            text += sec['sh_size']
+        elif sec['sh_type'] != 'SHT_NOBITS':
+            data += sec['sh_size']
+        else:
+            bss += sec['sh_size']
+    return text, data, bss
+
+def read_elf_section_sizes_or_none(filepath):
+    """Process-pool worker: (.text, .data, .bss) of filepath, or None for unreadable/non-ELF files."""
     try:
-        output = subprocess.check_output(
-            ['size', filepath],
-            universal_newlines=True,
-            stderr=subprocess.DEVNULL
-        )
-        lines = output.strip().split('\n')
-        if len(lines) >= 2:
-            parts = lines[1].split()
-            if len(parts) >= 4:
-                return int(parts[0]), int(parts[1]), int(parts[2])
+        with open(filepath, 'rb') as f:
+            # Magic check on the same handle, so non-ELF files never reach pyelftools
+            if f.read(len(ELF_MAGIC)) != ELF_MAGIC:
+                return None
+            f.seek(0)
+            return read_elf_section_sizes(f)
     except Exception:
-        pass
-    return 0, 0, 0
+        return None
+
+def run_size_batch(batch):
+    """Run `size` once over a batch of files and return {filepath: (.text, .data, .bss)}."""
+    sizes = {}
+    try:
+        # size exits non-zero if any file in the batch is not an object file,
+        # but still prints a line for every file it could read.
+        output = subprocess.run(
+            [SIZE_CMD, '--'] + batch,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            # Decode like os.scandir does, so undecodable names still match their paths
+            encoding=sys.getfilesystemencoding(),
+            errors='surrogateescape'
+        ).stdout
+    except Exception:
+        return sizes
+    requested = set(batch)
+    # Only drop the final newline: the last column is the filename and may end in whitespace.
+    for line in output.rstrip('\n').split('\n')[1:]:
+        # text data bss dec hex filename (filename may contain spaces)
+        parts = line.split(None, 5)
+        if len(parts) != 6:
+            continue
+        try:
+            section_sizes = (int(parts[0]), int(parts[1]), int(parts[2]))
+        except ValueError:
+            continue
+        name = parts[5]
+        if name in requested:
+            sizes[name] = section_sizes
+            continue
+        # Archive members are printed as "member.o (ex path/lib.a)"; keep the first member,
+        # which is what the old one-file-per-call parsing reported for an archive.
+        if name.endswith(')'):
+            start = name.find(' (ex ')
+            while start != -1:
+                archive = name[start + 5:-1]
+                if archive in requested:
+                    sizes.setdefault(archive, section_sizes)
+                    break
+                start = name.find(' (ex ', start + 1)
+    return sizes
+
+def get_elf_section_sizes(filepaths):
+    """Return {filepath: (.text, .data, .bss)} for ELF files.
+
+    Uses parallel `size` calls of SIZE_BATCH files each when binutils is installed,
+    and falls back to pyelftools otherwise (pyelftools is far slower per file than `size`).
+    Small inputs are handled serially. Other files are skipped by their magic bytes
+    (before batching for `size`, inside the worker for pyelftools) and are simply
+    missing from the result, as are files that cannot be read. Static archives are
+    only sized via `size`, which reports their first member like the old per-file call.
+    """
+    sizes = {}
+    parallel = len(filepaths) >= PARALLEL_MIN
+    if SIZE_CMD is None:
+        if ELFFile is None:
+            return sizes
+        # pyelftools parsing is CPU-bound pure Python, so only a multi-core pool helps.
+        if parallel and (os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor() as executor:
+                results = list(executor.map(read_elf_section_sizes_or_none, filepaths, chunksize=POOL_CHUNKSIZE))
+        else:
+            results = [read_elf_section_sizes_or_none(fp) for fp in filepaths]
+        for filepath, result in zip(filepaths, results):
+            if result is not None:
+                sizes[filepath] = result
+        return sizes
+
+    filepaths = [fp for fp in filepaths if is_size_candidate(fp)]
+    batches = [filepaths[i:i + SIZE_BATCH] for i in range(0, len(filepaths), SIZE_BATCH)]
+    if parallel and len(batches) > 1:
+        # The work happens in the `size` child processes, so threads are enough here.
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for part in executor.map(run_size_batch, batches):
+                sizes.update(part)
+    else:
+        for batch in batches:
+            sizes.update(run_size_batch(batch))
+    return sizes
+
+CLEAN_TABLE = str.maketrans('', '', '0123456789.-')
+CLEAN_PATTERN = re.compile(r'[\d.\-]')
 
 def clean_filename(filename):
     """Remove digits, dots, and hyphens from the filename (including extension)."""
-    return re.sub(r'[\d.\-]', '', filename)
+    # translate is enough for ASCII names; the regex also covers non-ASCII (Unicode) digits.
+    if filename.isascii():
+        return filename.translate(CLEAN_TABLE)
+    return CLEAN_PATTERN.sub('', filename)
 
 def generate_uniq_id(entries):
     """Replace all duplicated UniqIDs with the original directory+filename."""
-    uniqid_counts = defaultdict(int)
-    duplicated_ids = set()
+    # UniqID -> first entry that produced it, or None once that entry has been reverted
+    first_seen = {}
     for entry in entries:
         dirpath, filename = entry[0], entry[1]
-        cleaned = clean_filename(filename)
-        entry.append(dirpath + cleaned)
-        uniqid_counts[entry[-1]] += 1
-    duplicated_ids = {uid for uid, cnt in uniqid_counts.items() if cnt > 1}
-    for entry in entries:
-        if entry[-1] in duplicated_ids:
-            entry[-1] = entry[0] + entry[1]
+        uniq_id = dirpath + clean_filename(filename)
+        if uniq_id in first_seen:
+            first = first_seen[uniq_id]
+            if first is not None:
+                first[-1] = first[0] + first[1]
+                first_seen[uniq_id] = None
+            uniq_id = dirpath + filename
+        else:
+            first_seen[uniq_id] = entry
+        entry.append(uniq_id)
 
 def list_files_info(directory):
     entries = []
-    for root, dirs, files in os.walk(directory):
-        # 심볼릭 링크된 디렉토리는 탐색 대상에서 제외
-        dirs[:] = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+    filepaths = []
+    # Same pre-order as os.walk, but DirEntry gives link/type/size info without extra stat calls.
+    pending = [directory]
+    while pending:
+        root = pending.pop()
+        try:
+            with os.scandir(root) as it:
+                dir_entries = list(it)
+        except OSError:
+            continue
 
         dirpath = root.replace("\\", "/")
         if not dirpath.endswith("/"):
             dirpath += "/"
 
-        for file in files:
-            filepath = os.path.join(root, file)
-            # Skip symbolic links
-            if os.path.islink(filepath):
-                continue
+        subdirs = []
+        for dir_entry in dir_entries:
+            try:
+                # 심볼릭 링크(파일/디렉토리)는 탐색 대상에서 제외
+                if dir_entry.is_symlink():
+                    continue
+                if dir_entry.is_dir(follow_symlinks=False):
+                    subdirs.append(dir_entry.path)
+                    continue
+            except OSError:
+                pass
             try:
-                filesize = os.path.getsize(filepath)
-                text, data, bss = get_elf_section_sizes(filepath)
-                entries.append([dirpath, file, filesize, text, data, bss])
+                filesize = dir_entry.stat(follow_symlinks=False).st_size
+                entries.append([dirpath, dir_entry.name, filesize])
+                filepaths.append(dir_entry.path)
             except Exception:
-                entries.append([dirpath, file, 0, 0, 0, 0])
+                entries.append([dirpath, dir_entry.name, 0, 0, 0, 0])
+                filepaths.append(None)
+        pending.extend(reversed(subdirs))
+
+    # Files too small to hold the ELF magic are never candidates; the magic itself is checked later.
+    sizes = get_elf_section_sizes([
+        fp for entry, fp in zip(entries, filepaths)
+        if fp is not None and entry[2] >= len(ELF_MAGIC)
+    ])
+    for entry, filepath in zip(entries, filepaths):
+        if filepath is not None:
+            entry.extend(sizes.get(filepath, (0, 0, 0)))
     generate_uniq_id(entries)
     return entries
 
+CSV_HEADER = ['directory', 'filename', 'filesize', '.textsize', '.datasize', '.bsssize', 'UniqID']
+CSV_BUFFER_SIZE = 1 << 20
+
 def save_to_csv(file_list):
-    with open('FileList.csv', 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['directory', 'filename', 'filesize', '.textsize', '.datasize', '.bsssize', 'UniqID'])
-        writer.writerows(file_list)
+    # Large BufferedWriter underneath so the rows reach the disk in a few big writes.
+    with open('FileList.csv', 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as f:
+        csv.writer(f).writerows(chain([CSV_HEADER], file_list))
 
 def main(directory):
     save_to_csv(list_files_info(directory))